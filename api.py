@@ -1,13 +1,36 @@
 # backend/api.py
-from fastapi import FastAPI, UploadFile, File
+import asyncio
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from contextlib import asynccontextmanager
+from fastapi import FastAPI, UploadFile, File, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
-from pydantic import BaseModel
+from fastapi.responses import ORJSONResponse
+from pydantic import BaseModel, Field
 from typing import Optional, Dict, Any
-from universal_mc import example_cma, portfolio_from_dict, run_mc, MCConfig
+from universal_mc import CMA, example_cma, portfolio_from_dict, run_mc, MCConfig, _init_worker
 from parser_docx import parse_portfolio_overview_docx
 import numpy as np
 
-app = FastAPI(title="Advisor Monte Carlo API")
+def _new_pool() -> ProcessPoolExecutor:
+    # One pool shared by every /simulate call. Each simulation runs in a single
+    # worker process and concurrent requests spread across the cores, so numba
+    # gets one thread per worker: workers x threads stays at cpu_count.
+    # spawn, not fork: numba's thread pool is not fork-safe once it has started
+    return ProcessPoolExecutor(max_workers=os.cpu_count(),
+                               mp_context=multiprocessing.get_context("spawn"),
+                               initializer=_init_worker, initargs=(1,))
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    app.state.pool = _new_pool()
+    yield
+    app.state.pool.shutdown()
+
+app = FastAPI(title="Advisor Monte Carlo API", lifespan=lifespan,
+              default_response_class=ORJSONResponse)
 
 app.add_middleware(
     CORSMiddleware,
@@ -20,44 +43,61 @@ app.add_middleware(
 class SimRequest(BaseModel):
     portfolio: Dict[str, Any]
     cma_override: Optional[Dict[str, Any]] = None
-    n_paths: int = 10000
+    # bounded so a single request can't exhaust a worker's memory
+    n_paths: int = Field(10000, ge=1, le=200_000)
     seed: int = 42
 
 @app.post("/parse-docx")
-async def parse_docx(file: UploadFile = File(...)):
-    # Save & parse
-    tmp_path = f"/tmp/{file.filename}"
-    with open(tmp_path, "wb") as f:
-        f.write(await file.read())
-
-    portfolio_dict = parse_portfolio_overview_docx(tmp_path)
+def parse_docx(file: UploadFile = File(...)):
+    # python-docx reads the spooled upload directly: no /tmp copy, and the
+    # client-supplied filename never touches the filesystem. Sync def so
+    # FastAPI runs the blocking read/parse in its threadpool.
+    portfolio_dict = parse_portfolio_overview_docx(file.file)
     return {"portfolio": portfolio_dict}
 
-@app.post("/simulate")
-def simulate(req: SimRequest):
+def _run_mc_worker(portfolio_dict: Dict[str, Any], cma_override: Optional[Dict[str, Any]],
+                   n_paths: int, seed: int) -> Dict[str, Any]:
+    # Runs inside app.state.pool; takes and returns plain (picklable) data
     # CMA
     cma = example_cma()
     # Optional: support full override of mu/vol/corr (if supplied)
-    if req.cma_override:
-        mu = req.cma_override.get("mu_ann") or cma.mu_ann
-        vol = req.cma_override.get("vol_ann") or cma.vol_ann
-        corr = req.cma_override.get("corr") or cma.corr
-        from universal_mc import CMA
+    if cma_override:
+        mu = cma_override.get("mu_ann") or cma.mu_ann
+        vol = cma_override.get("vol_ann") or cma.vol_ann
+        corr = cma_override.get("corr") or cma.corr
         cma = CMA(mu_ann=mu, vol_ann=vol, corr=corr)
 
-    from universal_mc import portfolio_from_dict
-    portfolio = portfolio_from_dict(req.portfolio)
-    cfg = MCConfig(n_paths=req.n_paths, seed=req.seed, store_percentiles=True)
+    portfolio = portfolio_from_dict(portfolio_dict)
+    # already in a pool worker: simulate in-process rather than fanning out again
+    cfg = MCConfig(n_paths=n_paths, seed=seed, store_percentiles=True, n_workers=1)
     result = run_mc(portfolio, cma, cfg)
 
+    # percentile series stay ndarrays; orjson serializes them natively
     resp = {
         "prob_by_goal": result.prob_by_goal,
         "summary": result.summary,
         "ptiles_over_time": {
-            "p10": result.ptiles_over_time["p10"].tolist(),
-            "p50": result.ptiles_over_time["p50"].tolist(),
-            "p90": result.ptiles_over_time["p90"].tolist()
+            "p10": result.ptiles_over_time["p10"],
+            "p50": result.ptiles_over_time["p50"],
+            "p90": result.ptiles_over_time["p90"]
         } if result.ptiles_over_time else None
     }
     return resp
 
+@app.post("/simulate")
+async def simulate(req: SimRequest):
+    # CPU-bound: run off the event loop so other requests keep being served
+    loop = asyncio.get_running_loop()
+    pool = app.state.pool
+    try:
+        resp = await loop.run_in_executor(pool, _run_mc_worker,
+                                          req.portfolio, req.cma_override, req.n_paths, req.seed)
+    except BrokenProcessPool:
+        # a worker died (e.g. OOM): swap in a fresh pool so later requests
+        # still work, and fail only this one
+        if app.state.pool is pool:
+            app.state.pool = _new_pool()
+            pool.shutdown(wait=False)
+        raise HTTPException(status_code=503, detail="simulation worker crashed; retry")
+    # returned as a Response so FastAPI skips jsonable_encoder on the ndarrays
+    return ORJSONResponse(resp)
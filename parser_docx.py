@@ -1,11 +1,35 @@
 # backend/parser_docx.py
 import re
-from typing import Dict, List, Tuple
+from typing import IO, Dict, List, Tuple, Union
 from docx import Document
 
 MONEY = r"[-+]?\$?\s?[\d,]+(?:\.\d{1,2})?"
 PCT   = r"[-+]?\d{1,3}(?:\.\d+)?\s?%"
 
+# Compiled once at import; parse_portfolio_overview_docx runs per upload
+_CLIENT_RE      = re.compile(r"Client\s*:\s*([A-Za-z ,.'-]+)", re.IGNORECASE)
+_HORIZON_RE     = re.compile(r"(Time\s*Horizon|Horizon)\D+(\d{1,2})\s*(?:years|yrs)?", re.IGNORECASE)
+_GOAL_RE        = re.compile(r"(Goal|Retirement)\D+(" + MONEY + ")", re.IGNORECASE)
+_SAV_MONTHLY_RE = re.compile(r"(Monthly\s+Savings|Savings\s+Monthly)\D+(" + MONEY + ")", re.IGNORECASE)
+_SAV_ANNUAL_RE  = re.compile(r"(401k|Tax-advantaged|Retirement\s+Plan)\D+(" + MONEY + ")", re.IGNORECASE)
+_LIQUIDITY_RE   = re.compile(r"(Liquidity\s*(?:Need|Floor|Requirement))\D+(" + PCT + ")", re.IGNORECASE)
+
+# Line-scoped patterns, swept with finditer over the text with every
+# splitlines() boundary (\r, \x0b, \u2028, ...) rewritten as \n: whitespace may
+# not cross a newline, and ^ (re.M) pins each match to a line start, so there is
+# at most one match per line. The lazy prefix keeps search()'s leftmost-match
+# semantics for accounts; sleeves must be the entire line ("Label  NN%").
+_WS = r"[^\S\n]"
+_ACCOUNT_RE = re.compile(
+    r"^[^\n]*?([A-Za-z0-9 ()./-]{3,60})" + _WS + r"+(?:balance|value|total)?" + _WS + r"*("
+    + MONEY.replace(r"\s", _WS) + r")",
+    re.IGNORECASE | re.M,
+)
+_SLEEVE_RE = re.compile(
+    r"^([A-Za-z_ /&()-]{3,40})" + _WS + r"+(" + PCT.replace(r"\s", _WS) + r")" + _WS + r"*$",
+    re.M,
+)
+
 def _to_float_money(s: str) -> float:
     s = s.replace(',', '').replace('$','').strip()
     try: return float(s)
@@ -16,68 +40,65 @@ def _to_float_pct(s: str) -> float:
     try: return float(s)/100.0
     except: return 0.0
 
-def parse_portfolio_overview_docx(path: str) -> Dict:
+def parse_portfolio_overview_docx(path: Union[str, IO[bytes]]) -> Dict:
+    # path may be a filename or any seekable binary file object
     doc = Document(path)
     text = "\n".join(p.text for p in doc.paragraphs)
 
     # Client name (optional)
-    m_client = re.search(r"Client\s*:\s*([A-Za-z ,.'-]+)", text, re.IGNORECASE)
+    m_client = _CLIENT_RE.search(text)
     name = m_client.group(1).strip() if m_client else "Client"
 
     # Time horizon (years)
-    m_horizon = re.search(r"(Time\s*Horizon|Horizon)\D+(\d{1,2})\s*(?:years|yrs)?", text, re.IGNORECASE)
+    m_horizon = _HORIZON_RE.search(text)
     horizon_years = int(m_horizon.group(2)) if m_horizon else 20
 
     # Goal (retirement target)
-    m_goal = re.search(r"(Goal|Retirement)\D+(" + MONEY + ")", text, re.IGNORECASE)
+    m_goal = _GOAL_RE.search(text)
     goal_target = _to_float_money(m_goal.group(2)) if m_goal else 2500000.0
 
     # Recurring savings (monthly taxable)
-    m_sav_m = re.search(r"(Monthly\s+Savings|Savings\s+Monthly)\D+(" + MONEY + ")", text, re.IGNORECASE)
+    m_sav_m = _SAV_MONTHLY_RE.search(text)
     monthly_taxable = _to_float_money(m_sav_m.group(2)) if m_sav_m else 0.0
 
     # Annual 401k / tax-advantaged
-    m_sav_a = re.search(r"(401k|Tax-advantaged|Retirement\s+Plan)\D+(" + MONEY + ")", text, re.IGNORECASE)
+    m_sav_a = _SAV_ANNUAL_RE.search(text)
     annual_taxadv = _to_float_money(m_sav_a.group(2)) if m_sav_a else 0.0
 
     # Liquidity floor
-    m_liq = re.search(r"(Liquidity\s*(?:Need|Floor|Requirement))\D+(" + PCT + ")", text, re.IGNORECASE)
+    m_liq = _LIQUIDITY_RE.search(text)
     liq_floor = _to_float_pct(m_liq.group(2)) if m_liq else 0.0
 
-    # Account balances (coarse patterns)
+    # Account balances (coarse patterns) and asset allocation sleeves
+    # Accounts: "Fidelity Brokerage ... $578,325", "401(k) ... $571,366", "Money Market ... $150,000"
+    # Sleeves:  "Equity ... 70%", "Fixed Income ... 25%", "Cash ... 15%" or more granular sleeves
+    lines = "\n".join(text.splitlines())
     accounts: List[Tuple[str,str,float]] = []
-    for line in text.splitlines():
-        # Examples: "Fidelity Brokerage ... $578,325", "401(k) ... $571,366", "Money Market ... $150,000"
-        m = re.search(r"([A-Za-z0-9 ()./-]{3,60})\s+(?:balance|value|total)?\s*(" + MONEY + r")", line, re.IGNORECASE)
-        if m:
-            name_line = m.group(1).strip()
-            amt = _to_float_money(m.group(2))
-            if amt <= 0: continue
+    for m in _ACCOUNT_RE.finditer(lines):
+        name_line = m.group(1).strip()
+        amt = _to_float_money(m.group(2))
+        if amt > 0:
             lower = name_line.lower()
             if "401" in lower or "ira" in lower: acc_type = "tax-advantaged"
             elif "money market" in lower or "cash" in lower: acc_type = "cash_like"
             else: acc_type = "taxable"
             accounts.append((name_line, acc_type, amt))
 
-    # Asset allocation section
-    # Lines like: "Equity ... 70%", "Fixed Income ... 25%", "Cash ... 15%" or more granular sleeves
     sleeves = []
-    for line in text.splitlines():
-        m = re.search(r"([A-Za-z_ /&()-]{3,40})\s+(" + PCT + ")", line)
-        if m:
-            lbl = m.group(1).strip().replace(' ','_').replace('/','_')
-            pct = _to_float_pct(m.group(2))
-            # Basic normalization of labels to our taxonomy
-            norm = (
-                "Equity_US" if "us" in lbl.lower() and "equity" in lbl.lower()
-                else "Equity_Intl_Dev" if "intl" in lbl.lower() or "international" in lbl.lower()
-                else "Fixed_Income_IG" if "fixed" in lbl.lower() or "bond" in lbl.lower()
-                else "Alternatives_Other" if "altern" in lbl.lower() or "reit" in lbl.lower()
-                else "Cash" if "cash" in lbl.lower() or "money" in lbl.lower()
-                else None
-            )
-            if norm:
-                sleeves.append((norm, pct))
+    for m in _SLEEVE_RE.finditer(lines):
+        lbl = m.group(1).strip().replace(' ','_').replace('/','_')
+        pct = _to_float_pct(m.group(2))
+        # Basic normalization of labels to our taxonomy
+        norm = (
+            "Equity_US" if "us" in lbl.lower() and "equity" in lbl.lower()
+            else "Equity_Intl_Dev" if "intl" in lbl.lower() or "international" in lbl.lower()
+            else "Fixed_Income_IG" if "fixed" in lbl.lower() or "bond" in lbl.lower()
+            else "Alternatives_Other" if "altern" in lbl.lower() or "reit" in lbl.lower()
+            else "Cash" if "cash" in lbl.lower() or "money" in lbl.lower()
+            else None
+        )
+        if norm:
+            sleeves.append((norm, pct))
     # If nothing parsed, default to simple 70/25/5
     if not sleeves:
         sleeves = [("Equity_US", 0.70), ("Fixed_Income_IG", 0.25), ("Alternatives_Other", 0.05)]
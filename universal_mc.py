@@ -1,9 +1,26 @@
 # backend/universal_mc.py
 from __future__ import annotations
+import functools
+import math
+import multiprocessing
+import os
 import numpy as np
-from dataclasses import dataclass
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field, replace
+from collections import OrderedDict
+from collections.abc import Mapping
 from typing import List, Dict, Optional, Tuple
 
+try:
+    from numba import njit, prange, set_num_threads
+except ImportError:  # numba is optional; the NumPy step is used instead
+    njit = prange = set_num_threads = None
+
+try:
+    import cupy
+except ImportError:  # cupy is optional; only needed for MCConfig(device="cuda")
+    cupy = None
+
 # ---------------------------
 # Data structures
 # ---------------------------
@@ -55,17 +72,69 @@ class ClientPortfolio:
     horizon_years: int
     steps_per_year: int = 12
 
+    def to_arrays(self) -> Dict[str, np.ndarray]:
+        # account balances, target weights and their classes as contiguous arrays;
+        # rebuilt per call (O(K)) so edits to the lists are always picked up
+        return {
+            "balances": np.asarray([a.balance for a in self.accounts], dtype=np.float64),
+            "w_target": np.asarray([w.weight for w in self.target_allocation], dtype=np.float64),
+            "classes": np.asarray([w.cls for w in self.target_allocation], dtype=str),
+        }
+
 # ---------------------------
 # Capital Market Assumptions
 # ---------------------------
 
+class _CorrView(Mapping):
+    # read-only (a, b) -> correlation view over a dense matrix, so CMAs built
+    # from a matrix still expose the pairwise `corr` dict interface
+    def __init__(self, matrix: np.ndarray, class_index: Dict[str, int]):
+        self._matrix = matrix
+        self._index = class_index
+
+    def __getitem__(self, pair: Tuple[str,str]) -> float:
+        a, b = pair
+        return float(self._matrix[self._index[a], self._index[b]])
+
+    def __iter__(self):
+        return ((a, b) for a in self._index for b in self._index)
+
+    def __len__(self) -> int:
+        return len(self._index) ** 2
+
 @dataclass
 class CMA:
     mu_ann: Dict[str, float]               # expected return (annual)
     vol_ann: Dict[str, float]              # volatility (annual)
-    corr: Dict[Tuple[str,str], float]      # pairwise correlations
-
+    corr: Optional[Dict[Tuple[str,str], float]] = None   # pairwise correlations
+    # dense form of `corr`; pass both instead of `corr`, or leave them to be built from it
+    corr_matrix: Optional[np.ndarray] = field(default=None, repr=False, compare=False)
+    class_index: Optional[Dict[str, int]] = field(default=None, repr=False, compare=False)
+    # (mu_m, chol) per (classes, steps_per_year), LRU-bounded by _PARAMS_CACHE_SIZE
+    _params_cache: OrderedDict[Tuple, Tuple[np.ndarray, np.ndarray]] = field(
+        default_factory=OrderedDict, init=False, repr=False, compare=False)
+
+    def __post_init__(self):
+        if (self.corr_matrix is None) != (self.class_index is None):
+            raise ValueError("CMA: corr_matrix and class_index must be given together")
+        if self.corr is None and self.corr_matrix is None:
+            raise ValueError("CMA: pass either corr or corr_matrix with class_index")
+        if self.corr_matrix is not None:
+            if self.corr is None:
+                self.corr = _CorrView(self.corr_matrix, self.class_index)
+            return
+        keys = [k for pair in self.corr for k in pair]
+        self.class_index = {c: i for i, c in enumerate(dict.fromkeys(keys))}
+        n = len(self.class_index)
+        self.corr_matrix = np.full((n, n), np.nan)   # nan marks a missing pair
+        if self.corr:
+            rows, cols = zip(*((self.class_index[a], self.class_index[b]) for a, b in self.corr))
+            self.corr_matrix[list(rows), list(cols)] = list(self.corr.values())
+
+@functools.lru_cache(maxsize=1)
 def example_cma() -> CMA:
+    # built once per process and shared, so its (mu_m, chol) cache carries
+    # across simulations; treat the returned CMA as read-only
     mu_ann = {
         "Equity_US": 0.07, "Equity_US_SmallMid": 0.08,
         "Equity_Intl_Dev": 0.065, "Equity_Intl_EM": 0.085,
@@ -83,18 +152,20 @@ def example_cma() -> CMA:
         "Cash": 0.01
     }
     base = list(mu_ann.keys())
-    corr = {}
-    for a in base:
-        for b in base:
-            if a == b: corr[(a,b)] = 1.0
-            else:
-                if "Equity" in a and "Equity" in b: corr[(a,b)] = 0.75
-                elif ("Equity" in a and "REIT" in b) or ("REIT" in a and "Equity" in b): corr[(a,b)] = 0.65
-                elif ("Equity" in a and "Fixed" in b) or ("Fixed" in a and "Equity" in b): corr[(a,b)] = 0.20
-                elif "Fixed" in a and "Fixed" in b: corr[(a,b)] = 0.35
-                elif "Cash" in a or "Cash" in b: corr[(a,b)] = 0.05
-                else: corr[(a,b)] = 0.30
-    return CMA(mu_ann, vol_ann, corr)
+    is_eq = np.array(["Equity" in c for c in base])
+    is_fi = np.array(["Fixed" in c for c in base])
+    is_reit = np.array(["REIT" in c for c in base])
+    is_cash = np.array(["Cash" in c for c in base])
+    both = lambda m, n: np.outer(m, n) | np.outer(n, m)
+    corr_matrix = np.select(
+        [both(is_eq, is_eq), both(is_eq, is_reit), both(is_eq, is_fi),
+         both(is_fi, is_fi), is_cash[:, None] | is_cash[None, :]],
+        [0.75, 0.65, 0.20, 0.35, 0.05],
+        default=0.30,
+    )
+    np.fill_diagonal(corr_matrix, 1.0)
+    class_index = {c: i for i, c in enumerate(base)}
+    return CMA(mu_ann, vol_ann, corr_matrix=corr_matrix, class_index=class_index)
 
 # ---------------------------
 # Helpers
@@ -103,27 +174,61 @@ def example_cma() -> CMA:
 def _mk_order(target_classes: List[str]) -> List[str]:
     return list(dict.fromkeys(target_classes))
 
+# keys are client-supplied class orders, so a long-lived CMA (example_cma())
+# only keeps the most recently used few
+_PARAMS_CACHE_SIZE = 32
+
 def _monthly_params(cma: CMA, classes: List[str], steps_per_year: int):
+    key = (tuple(classes), steps_per_year)
+    cached = cma._params_cache.get(key)
+    if cached is not None:
+        cma._params_cache.move_to_end(key)
+        return cached
     mu = np.array([cma.mu_ann[c] for c in classes])
     vol = np.array([cma.vol_ann[c] for c in classes])
-    C = np.zeros((len(classes), len(classes)))
-    for i,a in enumerate(classes):
-        for j,b in enumerate(classes):
-            C[i,j] = cma.corr[(a,b)] * vol[i] * vol[j]
+    idx = [cma.class_index[c] for c in classes]
+    corr = cma.corr_matrix[np.ix_(idx, idx)]
+    if np.isnan(corr).any():
+        i, j = np.argwhere(np.isnan(corr))[0]
+        raise KeyError((classes[i], classes[j]))
+    C = corr * np.outer(vol, vol)
     mu_m = np.log1p(mu)/steps_per_year
     cov_m = C/steps_per_year
     chol = np.linalg.cholesky(cov_m)
+    cma._params_cache[key] = (mu_m, chol)
+    if len(cma._params_cache) > _PARAMS_CACHE_SIZE:
+        cma._params_cache.popitem(last=False)
     return mu_m, chol
 
 # ---------------------------
 # MC Core
 # ---------------------------
 
+# Paths are simulated in fixed-size chunks, each with its own RNG substream
+# spawned from the config seed, so results for a given seed don't depend on
+# how many worker processes happen to be available.
+_PATHS_PER_CHUNK = 2500
+
+# Starting a spawn worker (interpreter, imports, numba cache load) costs about
+# as much as simulating this many paths in-process, so each worker process is
+# only given work if it gets at least this many paths.
+_MIN_PATHS_PER_WORKER = 100_000
+
+# percentile bands tracked over time (MCResult.ptiles_over_time)
+_PTILES = (10, 50, 90)
+
+# correlated shocks are produced for this many steps at a time with one GEMM
+# (n_paths*tile, K) @ chol.T rather than one small matmul per step
+_SHOCK_TILE = 24
+
 @dataclass
 class MCConfig:
     n_paths: int = 10000
     seed: Optional[int] = 42
     store_percentiles: bool = True
+    n_workers: Optional[int] = 1           # worker processes; None -> os.cpu_count()
+    device: str = "cpu"                    # "cpu" | "cuda" (falls back to cpu without CuPy/GPU)
+    dtype: type = np.float32               # working precision of the path arrays
 
 @dataclass
 class MCResult:
@@ -132,18 +237,214 @@ class MCResult:
     prob_by_goal: Dict[str, float]
     summary: Dict[str, float]
 
-def run_mc(portfolio: ClientPortfolio, cma: CMA, mc: MCConfig) -> MCResult:
-    if mc.seed is not None:
-        np.random.seed(mc.seed)
+@dataclass
+class _SimSpec:
+    # loop-invariant inputs shared by every chunk (must stay picklable);
+    # the array fields carry the working dtype
+    mu_m: np.ndarray
+    chol: np.ndarray
+    w_target: np.ndarray
+    balances: np.ndarray
+    steps: int
+    steps_per_year: int
+    add_per_step: float                   # recurring contributions, per step
+    sched_add: np.ndarray                 # scheduled flows by step, length steps+1
+    liq_floor: float
+    idx_cash_like: Optional[int]
+    rebalance_monthly: bool
+
+def _cash_like_index(classes: List[str]) -> Optional[int]:
+    for i,c in enumerate(classes):
+        if "Cash" in c or "Money" in c or "TBill" in c:
+            return i
+    for i,c in enumerate(classes):
+        if "Fixed_Income" in c:
+            return i
+    return None
+
+def _recurring_per_step(rec: List[RecurringFlow], steps_per_year: int) -> float:
+    add_taxable = sum(r.amount_monthly for r in rec if r.account_type == "taxable")
+    add_taxadv_m = sum(r.amount_annual for r in rec if r.account_type == "tax-advantaged") / steps_per_year
+    return add_taxable + add_taxadv_m
+
+def _scheduled_per_step(sch: List[ScheduledFlow], steps: int, steps_per_year: int) -> np.ndarray:
+    # dense table of scheduled flows by step t (index 0 unused); a flow only
+    # lands within its own year, one-offs on every step of that year
+    sched_add = np.zeros(steps+1)
+    for s in sch:
+        # JSON clients may send whole-number floats ("year": 3.0); a
+        # fractional year never matched a step year, so it adds nothing
+        if s.year != int(s.year):
+            continue
+        m0 = (int(s.year)-1)*steps_per_year + 1
+        m_end = m0 + steps_per_year
+        if s.repeat_months is not None:
+            # steps t with m0 <= t < m0 + repeat_months
+            m_end = min(m_end, m0 + math.ceil(s.repeat_months))
+        sched_add[max(m0, 1):max(min(m_end, steps+1), 1)] += s.amount
+    return sched_add
+
+if njit is not None:
+    @njit(parallel=True, fastmath=True, cache=True)
+    def _step_kernel(bal, total, mu_m, shocks, w_target, add_per_step,
+                     rebalance, liq_floor, idx_cash_like):
+        # One time step per path in a single pass over its row, in place:
+        # expm1 growth + contribution, then (optionally) the liquidity-floor
+        # top-up and rebalance to w_target, writing the path total to total[p].
+        # Mirrors _step's NumPy path; idx_cash_like < 0 means no cash sleeve.
+        n_paths, K = bal.shape
+        for p in prange(n_paths):
+            tot = 0.0
+            for i in range(K):
+                r = math.expm1(mu_m[i] + shocks[p,i])
+                b = bal[p,i] * (1.0 + r) + add_per_step * w_target[i]
+                bal[p,i] = b
+                tot += b
+            if rebalance:
+                if liq_floor > 0 and idx_cash_like >= 0:
+                    cash = bal[p,idx_cash_like]
+                    pool = tot - cash
+                    deficit = liq_floor * tot - cash
+                    if deficit > 0 and pool > 0:
+                        frac = deficit / pool
+                        tot = 0.0
+                        for i in range(K):
+                            bal[p,i] *= 1.0 - frac
+                        bal[p,idx_cash_like] = cash + deficit
+                        for i in range(K):
+                            tot += bal[p,i]
+                for i in range(K):
+                    bal[p,i] = tot * w_target[i]
+            total[p] = tot
+
+    @njit(parallel=True, fastmath=True, cache=True)
+    def _total_step_kernel(total, mu_m, shocks, w_target, add_per_step):
+        # same step for paths held at w_target: only the portfolio total moves
+        n_paths, K = shocks.shape
+        for p in prange(n_paths):
+            growth = 1.0
+            for i in range(K):
+                growth += w_target[i] * math.expm1(mu_m[i] + shocks[p,i])
+            total[p] = total[p] * growth + add_per_step
+else:
+    _step_kernel = _total_step_kernel = None
+
+def _step(spec: _SimSpec, bal: np.ndarray, total: np.ndarray, shocks: np.ndarray,
+          add_per_step: float, xp=np) -> Tuple[np.ndarray, np.ndarray]:
+    if _step_kernel is not None and xp is np:
+        idx = spec.idx_cash_like if spec.idx_cash_like is not None else -1
+        _step_kernel(bal, total, spec.mu_m, shocks, spec.w_target, add_per_step,
+                     spec.rebalance_monthly, spec.liq_floor, idx)
+        return bal, total
+    r = xp.expm1(spec.mu_m + shocks)
+    bal *= (1.0 + r)
+    if add_per_step != 0.0:
+        bal += add_per_step * spec.w_target
+    if spec.rebalance_monthly:
+        bal = _rebalance(spec, bal, xp)
+    return bal, bal.sum(axis=1)
+
+def _total_step(spec: _SimSpec, total: np.ndarray, shocks: np.ndarray, add_per_step: float, xp=np):
+    # total * w_target grown by (1 + r) sums to total * (1 + r @ w_target)
+    if _total_step_kernel is not None and xp is np:
+        _total_step_kernel(total, spec.mu_m, shocks, spec.w_target, add_per_step)
+        return total
+    total *= 1.0 + xp.expm1(spec.mu_m + shocks) @ spec.w_target
+    total += add_per_step
+    return total
+
+def _rebalance(spec: _SimSpec, balances: np.ndarray, xp=np):
+    # balances: (n_paths, K); every row is rebalanced independently, in place
+    idx_cash_like = spec.idx_cash_like
+    total = balances.sum(axis=1, keepdims=True)
+    if spec.liq_floor > 0 and idx_cash_like is not None:
+        # top the cash sleeve up to the floor, funded pro rata from the other
+        # sleeves: scale every column by (1 - deficit/pool), then set cash
+        cash = balances[:, idx_cash_like].copy()
+        pool = total[:, 0] - cash                  # sum of the non-cash sleeves
+        deficit = xp.maximum(spec.liq_floor * total[:, 0] - cash, 0.0)
+        deficit = xp.where(pool > 0, deficit, 0.0)
+        frac = deficit / xp.where(pool > 0, pool, 1.0)
+        balances *= (1.0 - frac)[:, None]
+        balances[:, idx_cash_like] = cash + deficit
+        total = balances.sum(axis=1, keepdims=True)
+    return xp.multiply(total, spec.w_target, out=balances)
+
+def _cuda_available() -> bool:
+    if cupy is None:
+        return False
+    try:
+        return cupy.cuda.runtime.getDeviceCount() > 0
+    except cupy.cuda.runtime.CUDARuntimeError:
+        return False
+
+def _simulate_chunk(spec: _SimSpec, n_local: int, store_percentiles: bool,
+                    seed_seq: np.random.SeedSequence,
+                    device: str = "cpu") -> Tuple[np.ndarray, Optional[np.ndarray]]:
+    """Simulate n_local paths; returns terminal values and the (len(_PTILES), steps+1) bands."""
+    if device == "cuda":
+        # same vectorized loop on device memory; only the results are copied back
+        xp = cupy
+        rng = cupy.random.default_rng(int(seed_seq.generate_state(1)[0]))
+        spec = replace(spec, mu_m=xp.asarray(spec.mu_m), chol=xp.asarray(spec.chol),
+                       w_target=xp.asarray(spec.w_target), balances=xp.asarray(spec.balances))
+    else:
+        xp = np
+        rng = np.random.default_rng(seed_seq)
+    K = len(spec.w_target)
+    # bands are reduced from all n_local paths as each step completes, so
+    # memory doesn't grow with the number of paths
+    bands = xp.empty((len(_PTILES), spec.steps+1)) if store_percentiles else None
+    # nearest-rank ("lower") order statistics: one O(n) partition per step
+    # picks all three instead of np.percentile's interpolated selection
+    kth = [p * (n_local - 1) // 100 for p in _PTILES]
+
+    # Rebalanced to w_target every step with no liquidity floor, a path is
+    # fully described by its total, so only the (n_local,) totals are carried.
+    # Otherwise all paths advance together as bal (n_local, K), one row per path.
+    has_floor = spec.liq_floor > 0 and spec.idx_cash_like is not None
+    totals_only = spec.rebalance_monthly and not has_floor
+    bal = None if totals_only else xp.broadcast_to(spec.balances, (n_local, K)).copy()
+    total = xp.full(n_local, spec.balances.sum(), dtype=spec.balances.dtype)
+    if bands is not None:
+        bands[:, 0] = xp.partition(total, kth)[kth]
+    for t0 in range(1, spec.steps+1, _SHOCK_TILE):
+        n_t = min(_SHOCK_TILE, spec.steps+1 - t0)
+        z = rng.standard_normal((n_t * n_local, K), dtype=spec.chol.dtype)
+        shocks = (z @ spec.chol.T).reshape(n_t, n_local, K)
+        for dt in range(n_t):
+            t = t0 + dt
+            add = spec.add_per_step + spec.sched_add[t]
+            if totals_only:
+                total = _total_step(spec, total, shocks[dt], add, xp)
+            else:
+                bal, total = _step(spec, bal, total, shocks[dt], add, xp)
+            if bands is not None:
+                bands[:, t] = xp.partition(total, kth)[kth]
+    terminal = total.astype(np.float64)
+    if xp is not np:
+        terminal = cupy.asnumpy(terminal)
+        bands = cupy.asnumpy(bands) if bands is not None else None
+    return terminal, bands
+
+def _init_worker(n_threads: int):
+    # cap numba's thread pool so processes x threads stays within the core count
+    if set_num_threads is not None:
+        set_num_threads(n_threads)
+
+def _split(total: int, n: int) -> List[int]:
+    q, rem = divmod(total, n)
+    return [q + (1 if i < rem else 0) for i in range(n)]
 
-    classes = _mk_order([w.cls for w in portfolio.target_allocation])
+def run_mc(portfolio: ClientPortfolio, cma: CMA, mc: MCConfig) -> MCResult:
+    arrays = portfolio.to_arrays()
+    classes = _mk_order(arrays["classes"].tolist())
     steps = portfolio.horizon_years * portfolio.steps_per_year
     mu_m, chol = _monthly_params(cma, classes, portfolio.steps_per_year)
 
-    w_target = np.array([w.weight for w in portfolio.target_allocation], dtype=float)
-    w_target = w_target / w_target.sum()
+    w_target = arrays["w_target"] / arrays["w_target"].sum()
 
-    pv0 = sum(a.balance for a in portfolio.accounts)
+    pv0 = arrays["balances"].sum()
     balances = pv0 * w_target
 
     liq_floor = getattr(portfolio.constraints, 'liquidity_floor_pct', 0.0)
@@ -153,91 +454,56 @@ def run_mc(portfolio: ClientPortfolio, cma: CMA, mc: MCConfig) -> MCResult:
     rec = [RecurringFlow(**rf) for rf in portfolio.cash_flows.get("recurring", [])]
     sch = [ScheduledFlow(**sf) for sf in portfolio.cash_flows.get("scheduled", [])]
 
-    def add_recurring(balances: np.ndarray):
-        add_taxable = sum(r.amount_monthly for r in rec if r.account_type == "taxable")
-        add_taxadv_m = sum(r.amount_annual for r in rec if r.account_type == "tax-advantaged") / portfolio.steps_per_year
-        total_add = add_taxable + add_taxadv_m
-        if total_add != 0.0:
-            balances += total_add * w_target
-        return balances
-
-    def apply_scheduled(t: int, balances: np.ndarray):
-        yr = (t-1) // portfolio.steps_per_year + 1
-        for s in sch:
-            if s.repeat_months is None and s.year == yr:
-                balances += s.amount * w_target
-            elif s.repeat_months is not None:
-                if yr == s.year:
-                    m0 = (s.year-1)*portfolio.steps_per_year + 1
-                    m_end = m0 + s.repeat_months
-                    if m0 <= t < m_end:
-                        balances += (s.amount) * w_target
-        return balances
-
-    idx_cash_like = None
-    for i,c in enumerate(classes):
-        if "Cash" in c or "Money" in c or "TBill" in c:
-            idx_cash_like = i
-            break
-    if idx_cash_like is None:
-        for i,c in enumerate(classes):
-            if "Fixed_Income" in c:
-                idx_cash_like = i
-                break
-
-    def rebalance(balances: np.ndarray):
-        total = balances.sum()
-        if liq_floor > 0 and idx_cash_like is not None:
-            min_cash = liq_floor * total
-            if balances[idx_cash_like] < min_cash:
-                deficit = min_cash - balances[idx_cash_like]
-                others = np.arange(len(balances)) != idx_cash_like
-                pool = balances[others].sum()
-                if pool > 0:
-                    balances[others] -= deficit * (balances[others]/pool)
-                    balances[idx_cash_like] += deficit
-        total = balances.sum()
-        return total * w_target
-
-    terminal = np.empty(mc.n_paths)
-    sample_paths = None
-    if mc.store_percentiles:
-        keep = min(1500, mc.n_paths)
-        sample_paths = np.empty((keep, steps+1))
-
-    for path in range(mc.n_paths):
-        bal = balances.copy()
-        if sample_paths is not None and path < sample_paths.shape[0]:
-            sample_paths[path,0] = bal.sum()
-        for t in range(1, steps+1):
-            z = chol @ np.random.randn(len(classes))
-            r = np.exp(mu_m + z) - 1.0
-            bal *= (1.0 + r)
-            bal = add_recurring(bal)
-            bal = apply_scheduled(t, bal)
-            if rebalance_monthly:
-                bal = rebalance(bal)
-            if sample_paths is not None and path < sample_paths.shape[0]:
-                sample_paths[path,t] = bal.sum()
-        terminal[path] = bal.sum()
+    spec = _SimSpec(
+        mu_m=mu_m.astype(mc.dtype), chol=chol.astype(mc.dtype),
+        w_target=w_target.astype(mc.dtype), balances=balances.astype(mc.dtype),
+        steps=steps, steps_per_year=portfolio.steps_per_year,
+        add_per_step=_recurring_per_step(rec, portfolio.steps_per_year),
+        sched_add=_scheduled_per_step(sch, steps, portfolio.steps_per_year),
+        liq_floor=liq_floor,
+        idx_cash_like=_cash_like_index(classes),
+        rebalance_monthly=rebalance_monthly,
+    )
 
+    if mc.device == "cuda" and _cuda_available():
+        # one device-wide batch: the GPU wants as many paths per step as possible
+        chunks = [_simulate_chunk(spec, mc.n_paths, mc.store_percentiles,
+                                  np.random.SeedSequence(mc.seed), "cuda")]
+    else:
+        n_chunks = max(1, -(-mc.n_paths // _PATHS_PER_CHUNK))
+        sizes = _split(mc.n_paths, n_chunks)
+        stores = [mc.store_percentiles] * n_chunks
+        seeds = np.random.SeedSequence(mc.seed).spawn(n_chunks)
+
+        n_workers = min(mc.n_workers or os.cpu_count() or 1, n_chunks,
+                        max(1, mc.n_paths // _MIN_PATHS_PER_WORKER))
+        if n_workers > 1:
+            n_threads = max(1, (os.cpu_count() or 1) // n_workers)
+            # spawn, not fork: numba's thread pool is not fork-safe once it has started
+            with ProcessPoolExecutor(max_workers=n_workers, mp_context=multiprocessing.get_context("spawn"),
+                                     initializer=_init_worker, initargs=(n_threads,)) as pool:
+                chunks = list(pool.map(_simulate_chunk, [spec] * n_chunks, sizes, stores, seeds))
+        else:
+            chunks = [_simulate_chunk(spec, n, st, ss) for n, st, ss in zip(sizes, stores, seeds)]
+
+    terminal = np.concatenate([term for term, _ in chunks])
     ptiles_over_time = None
-    if sample_paths is not None:
-        ptiles_over_time = {
-            "p10": np.percentile(sample_paths, 10, axis=0),
-            "p50": np.percentile(sample_paths, 50, axis=0),
-            "p90": np.percentile(sample_paths, 90, axis=0)
-        }
+    if mc.store_percentiles:
+        # chunks are iid slices of the same simulation: combine their bands
+        # as the path-weighted mean of the per-chunk percentiles
+        bands = sum(len(term) * b for term, b in chunks) / len(terminal)
+        ptiles_over_time = {f"p{p}": bands[i] for i, p in enumerate(_PTILES)}
 
     prob_by_goal = {}
     for g in portfolio.goals:
         label = g.label or f"Goal@Y{g.year}"
         prob_by_goal[label] = float((terminal >= g.target).mean())
 
+    p5, p50, p95 = np.percentile(terminal, (5, 50, 95))
     summary = {
-        "median_terminal": float(np.median(terminal)),
-        "p5_terminal": float(np.percentile(terminal, 5)),
-        "p95_terminal": float(np.percentile(terminal, 95))
+        "median_terminal": float(p50),
+        "p5_terminal": float(p5),
+        "p95_terminal": float(p95)
     }
     return MCResult(terminal, ptiles_over_time, prob_by_goal, summary)
 